@@ -8,7 +8,7 @@ from alembic import context
 import os
 from dotenv import load_dotenv
 from app.database import Base
-from app.models import User, Play # This is how Alembic knows your tables
+from app.models import User, Play, PlayStats # This is how Alembic knows your tables
 
 load_dotenv()
 # this is the Alembic Config object, which provides
@@ -63,6 +63,17 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    # app.startup.migrate() passes in the connection it holds the migration lock on, so reuse it
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(
+            connection=connection, target_metadata=target_metadata
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
     # This tells Alembic to get the database URL from your .env file
     config.set_main_option("sqlalchemy.url", os.getenv("DATABASE_URL"))
     
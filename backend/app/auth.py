@@ -1,50 +1,53 @@
-import os
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache
 from typing import Optional
 
-from dotenv import load_dotenv
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext
 
+from .config import get_settings
 from .database import get_db
-from . import crud, schemas
+from . import schemas
 
 
-# --- Load secrets from .env ---
-
-load_dotenv()
-
-SECRET_KEY = os.getenv("TOUCHHUB_SECRET")
-if not SECRET_KEY:
-    raise RuntimeError("TOUCHHUB_SECRET is not set")
+# --- Secrets (read through config.get_settings(), which loads .env on first use) ---
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60))
+
+#main.py's lifespan calls this at startup, so a missing secret still fails the container early
+def get_secret_key() -> str:
+    secret_key = get_settings()["secret_key"]
+    if not secret_key:
+        raise RuntimeError("TOUCHHUB_SECRET is not set")
+    return secret_key
 
 # --- OAuth2 bearer scheme ---
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
 # --- Password hashing ---
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+#passlib is imported and the bcrypt backend loaded on first use (or during warmup), not at import time
+@lru_cache
+def get_pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+    return get_pwd_context().verify(plain, hashed)
 
 # --- JWT helpers ---
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     #data is just {"sub": "username"}, indicating subject is username of whoever tried to login
     to_encode = data.copy() 
     #expire will contain the time of expiry of the token
-    expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=get_settings()["access_token_expire_minutes"]))
     #add this expiry to the token
     to_encode.update({"exp": expire})
     #sign the token with secret key using jwt.encode(), and the given algo we set
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return jwt.encode(to_encode, get_secret_key(), algorithm=ALGORITHM)
 
 # --- Dependency: get current user from token so we know who to allow access to endpoints ---
 def get_current_user(
@@ -60,7 +63,7 @@ def get_current_user(
     )
     try:
         #decode the token by verifying signature, store the dict with sub and expiry in "payload"
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, get_secret_key(), algorithms=[ALGORITHM])
         #extract username
         username: Optional[str] = payload.get("sub")
         if username is None:
@@ -70,6 +73,8 @@ def get_current_user(
     except JWTError:
         raise credentials_error
 
+    #imported here because crud imports hash_password from this module, a top level import would be circular
+    from . import crud
     user = crud.get_user_by_username(db, username)
     if user is None:
         #username from token doesnt exist in the database
@@ -0,0 +1,24 @@
+#all settings read from the environment / .env, in one place
+#loaded on first use instead of at import time, so importing the app stays cheap
+import os
+from functools import lru_cache
+
+from dotenv import load_dotenv
+
+
+@lru_cache
+def get_settings() -> dict:
+    load_dotenv()
+    warmup_connections = os.getenv("WARMUP_CONNECTIONS")
+    return {
+        "database_url": os.getenv("DATABASE_URL"),
+        #checked by auth.get_secret_key(), so scripts that only need the db (e.g. migrations) dont require it
+        "secret_key": os.getenv("TOUCHHUB_SECRET"),
+        "access_token_expire_minutes": int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60)),
+        #how many pool connections startup warmup opens, None means the whole pool
+        "warmup_connections": int(warmup_connections) if warmup_connections else None,
+        #how often counters.py writes buffered play views/copies to the db
+        "counter_flush_seconds": float(os.getenv("COUNTER_FLUSH_SECONDS", 10)),
+        #a play's trending score halves every this many hours without new activity
+        "trending_half_life_hours": float(os.getenv("TRENDING_HALF_LIFE_HOURS", 24)),
+    }
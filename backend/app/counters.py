@@ -0,0 +1,94 @@
+#write-behind view/copy counters
+#each worker adds up counts in memory, and a background task flushes them to play_stats in one batched upsert,
+#so viewing a play (our hottest read) never does a write of its own
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+
+from fastapi.concurrency import run_in_threadpool
+
+from . import crud
+from .config import get_settings
+from .database import get_engine, SessionLocal
+
+
+logger = logging.getLogger("uvicorn.error")
+
+#play_id -> [views, copies] since the last flush
+#endpoints run in fastapi's threadpool, so guard it with a lock
+_pending = defaultdict(lambda: [0, 0])
+_lock = threading.Lock()
+
+#after this many failed flushes in a row the buffered counts are dropped (see flush)
+MAX_FAILED_FLUSHES = 5
+_failed_flushes = 0
+
+
+def record_view(play_id: int):
+    with _lock:
+        _pending[play_id][0] += 1
+
+
+def record_copy(play_id: int):
+    with _lock:
+        _pending[play_id][1] += 1
+
+
+def _take_pending():
+    global _pending
+    with _lock:
+        taken, _pending = _pending, defaultdict(lambda: [0, 0])
+    return {play_id: (views, copies) for play_id, (views, copies) in taken.items()}
+
+
+def _put_back(deltas):
+    with _lock:
+        for play_id, (views, copies) in deltas.items():
+            _pending[play_id][0] += views
+            _pending[play_id][1] += copies
+
+
+def flush():
+    global _failed_flushes
+    deltas = _take_pending()
+    if not deltas:
+        return 0
+    get_engine()
+    db = SessionLocal()
+    try:
+        written = crud.add_play_stats(db, deltas)
+    except Exception:
+        db.rollback()
+        _failed_flushes += 1
+        if _failed_flushes < MAX_FAILED_FLUSHES:
+            #keep the counts for the next flush instead of losing them
+            _put_back(deltas)
+        else:
+            #something in this batch keeps failing, drop it so it cant block counting for every other play forever
+            logger.error("Dropping buffered counts for %d plays after %d failed flushes", len(deltas), _failed_flushes)
+            _failed_flushes = 0
+        raise
+    finally:
+        db.close()
+    _failed_flushes = 0
+    return written
+
+
+def final_flush():
+    #called from main.py's lifespan on shutdown. Logs instead of raising so a db problem cant fail the shutdown
+    try:
+        flush()
+    except Exception:
+        logger.exception("Final flush of play counters failed")
+
+
+async def run_background():
+    #started from main.py's lifespan and cancelled on shutdown, which then does a final flush()
+    interval = get_settings()["counter_flush_seconds"]
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(flush)
+        except Exception:
+            logger.exception("Flushing play counters failed")
@@ -2,9 +2,14 @@
 #most of these CRUD operations create ORM objects using models, add them to db, and return them as ORM
 #the endpoints in routers then use response_model to let pydantic validate the models as python dicts, 
 #then filter for relevant fields and return serialized JSON
+import math
+import time
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 from . import models, schemas
 from .auth import hash_password
+from .config import get_settings
 
 
 
@@ -95,3 +100,77 @@ def delete_play(db: Session, play_id: int):
         db.delete(play)
         db.commit()
     return play
+
+
+
+### Play stats ---------------------------------------------------------------------------------------------
+#how much each event adds to a play's trending score. A copy says more about a play than a view does
+VIEW_WEIGHT = 1.0
+COPY_WEIGHT = 5.0
+#trending scores are measured against this fixed point in time (2025-10-01 UTC), see add_play_stats
+TRENDING_EPOCH = 1_759_276_800
+
+
+def _trending_increment(weight: float) -> float:
+    #instead of decaying every stored score as time passes, newer activity is worth exponentially more:
+    #weight * 2^((now - epoch) / half_life). Ranking by the sum gives the same order as a decaying score,
+    #so no score ever needs rewriting. We store log2 of the sum so it grows ~linearly and never overflows.
+    #(changing TRENDING_HALF_LIFE_HOURS changes the scale, so existing scores would need recomputing)
+    half_life_seconds = get_settings()["trending_half_life_hours"] * 3600
+    return math.log2(weight) + (time.time() - TRENDING_EPOCH) / half_life_seconds
+
+
+#below this the smaller term adds less than 2^-60 to the sum, so it is treated as 0
+MIN_LOG2_GAP = -60
+
+
+def _log2_add(a, b):
+    #log2(2^a + 2^b) in sql, written so the power() never overflows.
+    #the gap is clamped because postgres raises an underflow error instead of returning 0 once it gets below
+    #about -1075, which happens when a play is viewed again after a long quiet spell
+    high, low = func.greatest(a, b), func.least(a, b)
+    return high + func.ln(1 + func.power(2.0, func.greatest(low - high, MIN_LOG2_GAP))) / math.log(2)
+
+
+def add_play_stats(db: Session, deltas: dict[int, tuple[int, int]]):
+    #deltas is {play_id: (views, copies)} collected since the last flush. Written as one multi row upsert
+    #plays deleted since the counts were collected are dropped, otherwise the foreign key fails the whole batch
+    existing = {play_id for (play_id,) in db.query(models.Play.id).filter(models.Play.id.in_(list(deltas)))}
+    #rows are locked in the order they are listed. Sorting by play_id means two workers flushing
+    #overlapping plays always lock them in the same order, so they cant deadlock each other
+    rows = [
+        {
+            "play_id": play_id,
+            "view_count": views,
+            "copy_count": copies,
+            "trending_score": _trending_increment(views * VIEW_WEIGHT + copies * COPY_WEIGHT),
+        }
+        for play_id, (views, copies) in sorted(deltas.items())
+        if play_id in existing
+    ]
+    if not rows:
+        return 0
+    stmt = insert(models.PlayStats).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.PlayStats.play_id],
+        set_={
+            "view_count": models.PlayStats.view_count + stmt.excluded.view_count,
+            "copy_count": models.PlayStats.copy_count + stmt.excluded.copy_count,
+            "trending_score": _log2_add(models.PlayStats.trending_score, stmt.excluded.trending_score),
+        },
+    )
+    db.execute(stmt)
+    db.commit()
+    return len(rows)
+
+
+def get_trending_plays(db: Session, limit: int = 20):
+    #reads the precomputed score through its index, nothing is calculated per request
+    return (
+        db.query(models.Play)
+        .join(models.PlayStats)
+        .filter(models.Play.is_private == False)
+        .order_by(models.PlayStats.trending_score.desc(), models.Play.created_at.desc())
+        .limit(limit)
+        .all()
+    )
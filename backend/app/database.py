@@ -1,24 +1,41 @@
+import threading
 from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-DATABASE_URL = os.getenv("DATABASE_URL")
+from .config import get_settings
 
 #Engine is the bridge to the database
-engine = create_engine(DATABASE_URL)
+#it is created lazily by get_engine() instead of at import time, so importing models/schemas
+#(e.g. from alembic or the startup script) doesnt open a connection pool or need DATABASE_URL yet
+_engine = None
+#warmup, health checks and the counter flush can all call get_engine() from different threads at startup,
+#so creation is locked to make sure they all get (and SessionLocal binds to) the same engine and pool
+_engine_lock = threading.Lock()
 
 #sessionLocal is a session factory. It creates db sessions via the engine.
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+#bind is filled in by get_engine() the first time the engine is created
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 
 #All models inherit from declarative_base()
 Base = declarative_base()
 
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            #another thread may have created it while we waited for the lock
+            if _engine is None:
+                #pool_pre_ping drops dead connections from the pool (e.g. after a db restart) instead of erroring a request
+                engine = create_engine(get_settings()["database_url"], pool_pre_ping=True)
+                SessionLocal.configure(bind=engine)
+                _engine = engine
+    return _engine
+
+
 # Dependency to get DB session for each request
 #this will create session called db, yield the db to the endpoint, and when query is done closes sess
 def get_db():
+    get_engine()
     db = SessionLocal()
     try:
         yield db
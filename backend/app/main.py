@@ -1,11 +1,37 @@
-import os
+import time
+_import_started = time.perf_counter() #measure how long importing the app takes, reported by /health/ready
+
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
-from .database import Base, engine
-from .routers import plays, users, auth
+from fastapi.concurrency import run_in_threadpool
+from .auth import get_secret_key
+from .routers import plays, users, auth, health
+from . import startup, counters
 from fastapi.middleware.cors import CORSMiddleware
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    #fail straight away on missing config, rather than after the container reports alive
+    get_secret_key()
+    #warmup runs in the background so /health/live answers immediately, /health/ready flips once it finishes
+    warmup_task = asyncio.create_task(startup.run_warmup(app))
+    counters_task = asyncio.create_task(counters.run_background())
+    yield
+    #stop retrying warmup if we are shutting down before it finished
+    warmup_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await warmup_task
+    #write out whatever views/copies this worker still has buffered before it exits.
+    #wait for the background task first, so a flush it has in progress (and re-buffers on failure) finishes before ours
+    counters_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await counters_task
+    await run_in_threadpool(counters.final_flush)
+
+
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["https://touch-hub.vercel.app", "http://localhost:5173"],
@@ -18,7 +44,12 @@ app.add_middleware(
 app.include_router(users.router)
 app.include_router(plays.router)
 app.include_router(auth.router)
+app.include_router(health.router)
 
 @app.get("/")
 def root():
     return {"message": "TouchHub backend running!"}
+
+
+startup.state["started_at"] = _import_started
+startup.state["timings"]["import"] = round(time.perf_counter() - _import_started, 4)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, JSON, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, JSON, Boolean, DateTime, Float
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from .database import Base
@@ -36,4 +36,24 @@ class Play(Base):
 
     #Relationships
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    owner = relationship("User", back_populates="plays")
\ No newline at end of file
+    owner = relationship("User", back_populates="plays")
+    #passive_deletes lets the db's ON DELETE CASCADE remove the stats row instead of sqlalchemy loading it first
+    stats = relationship("PlayStats", back_populates="play", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
+
+
+
+#view/copy counters and trending score live in their own table, so counting a view never writes to the plays row
+#rows are written in batches by counters.py, not per request
+class PlayStats(Base):
+    __tablename__ = "play_stats"
+
+    #Fields
+    play_id = Column(Integer, ForeignKey("plays.id", ondelete="CASCADE"), primary_key=True)
+    view_count = Column(Integer, default=0, server_default="0", nullable=False)
+    copy_count = Column(Integer, default=0, server_default="0", nullable=False)
+    #time weighted popularity on a log2 scale (see crud.add_play_stats), indexed so GET /plays/trending is just an index scan
+    #only ever written when the play gets new views/copies, there is no background decay pass
+    trending_score = Column(Float, default=0.0, server_default="0", nullable=False, index=True)
+
+    #Relationships
+    play = relationship("Play", back_populates="stats")
@@ -0,0 +1,33 @@
+#liveness and readiness probes for the container platform
+#liveness only says the process is up, readiness says warmup finished and the db answers
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..database import get_db
+from ..startup import state
+
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+
+@router.get("/live")
+def liveness():
+    return {"status": "alive"}
+
+
+
+@router.get("/ready")
+def readiness(db: Session = Depends(get_db)):
+    if not state["ready"]:
+        #warmup keeps retrying, so an error here means "still starting, last attempt failed".
+        #this endpoint is public, so the error itself is only logged (by startup.run_warmup), never returned
+        status = "retrying" if state["error"] else "starting"
+        return JSONResponse(status_code=503, content={"status": status, "timings": state["timings"]})
+    try:
+        db.execute(text("SELECT 1"))
+    except Exception:
+        return JSONResponse(status_code=503, content={"status": "database unavailable", "timings": state["timings"]})
+    return {"status": "ready", "timings": state["timings"]}
@@ -1,8 +1,8 @@
 #routes for /plays, using functions from crud file
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
-from .. import crud, schemas, models
+from .. import counters, crud, schemas, models
 from ..database import get_db
 from ..auth import get_current_user  
 
@@ -46,6 +46,13 @@ def read_public_plays(db: Session = Depends(get_db)):
     )
 
 
+#must be declared before /{play_id}, otherwise "trending" is parsed as a play id
+@router.get("/trending", response_model=list[schemas.PlayOut])
+def read_trending_plays(limit: int = Query(20, ge=1, le=100), db: Session = Depends(get_db)):
+    """Return public plays ranked by recent views and copies (precomputed in the background)."""
+    return crud.get_trending_plays(db, limit=limit)
+
+
 """
 @router.get("/", response_model=list[schemas.PlayOut])
 def read_plays(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
@@ -67,6 +74,9 @@ def read_play(
     if play.is_private and play.owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Play is private")
 
+    #only buffered in memory here, counters.py writes it to the db in batches. Owners viewing their own play dont count
+    if play.owner_id != current_user.id:
+        counters.record_view(play.id)
     return play
 
 
@@ -102,6 +112,33 @@ def update_existing_play(
 
 
 
+#copies someone's play into the current user's own plays (private by default) so they can edit it
+@router.post("/{play_id}/copy", response_model=schemas.PlayOut)
+def copy_play(
+    play_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user),
+):
+    play = crud.get_play_by_id(db, play_id)
+    if not play:
+        raise HTTPException(status_code=404, detail="Play not found")
+    if play.is_private and play.owner_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Play is private")
+
+    new_play = schemas.PlayCreate(
+        title=f"{play.title} (copy)",
+        description=play.description,
+        frame_data=play.frame_data,
+        is_private=True,
+    )
+    copied = crud.create_play(db, new_play, owner_id=current_user.id)
+    if play.owner_id != current_user.id:
+        counters.record_copy(play.id)
+    return copied
+
+
+
+
 #no need response model, since we are returning a python dict which fastAPI converts to json automatically
 #compared to pydantic validation and filtration whcih we need response_model to trigger
 @router.delete("/{play_id}")
@@ -0,0 +1,197 @@
+#container startup: locked migrations, warmup before readiness, and startup timings
+#entrypoint.sh runs `python -m app.startup migrate` before uvicorn, and main.py's lifespan runs warmup()
+import asyncio
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+
+from .config import get_settings
+from .database import get_engine
+
+
+#uvicorn only configures its own loggers, so log under uvicorn.error to have startup lines show in container logs
+logger = logging.getLogger("uvicorn.error")
+
+#any fixed 64 bit number works, it just has to be the same on every replica so they all wait on the same lock
+MIGRATION_LOCK_KEY = 7_268_430_015
+
+#backoff between failed warmup attempts, doubling from min up to max
+WARMUP_RETRY_MIN_SECONDS = 1.0
+WARMUP_RETRY_MAX_SECONDS = 30.0
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+#shared startup state, read by the /health endpoints
+#error is True while a failed warmup is being retried (the details only go to the log)
+#timings are in seconds, keyed by phase (import, warmup.pool, ..., ready)
+#started_at is set by main.py when the app starts importing, so "ready" is the full time to readiness
+state = {
+    "started_at": None,
+    "ready": False,
+    "error": False,
+    "timings": {},
+}
+
+
+@contextmanager
+def timed(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        state["timings"][name] = round(time.perf_counter() - started, 4)
+
+
+### Migrations -----------------------------------------------------------------------------------------
+
+def _alembic_heads():
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config(ALEMBIC_INI)
+    return config, set(ScriptDirectory.from_config(config).get_heads())
+
+
+def _current_heads(connection):
+    from alembic.runtime.migration import MigrationContext
+
+    return set(MigrationContext.configure(connection).get_current_heads())
+
+
+def migrate():
+    """Upgrade the db to head, safely when many replicas start at once.
+
+    If the db is already at head we skip straight away without taking the lock (the common case on scale out).
+    Otherwise we take a postgres advisory lock so only one replica runs alembic, and the others wait,
+    re-check, and find there is nothing left to do.
+    """
+    from alembic import command
+
+    config, heads = _alembic_heads()
+    engine = get_engine()
+
+    with engine.connect() as connection:
+        if _current_heads(connection) == heads:
+            print("Database already at head, skipping migrations.")
+            return False
+
+        use_lock = engine.dialect.name == "postgresql"
+        if use_lock:
+            print("Waiting for migration lock...")
+            connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            #the lock is held by the session not the transaction, so end the transaction alembic would otherwise join
+            connection.commit()
+        try:
+            #another replica may have migrated while we were waiting for the lock
+            if _current_heads(connection) == heads:
+                print("Database migrated by another instance, skipping migrations.")
+                return False
+            connection.commit()
+            #env.py uses this connection instead of opening its own, so the migration runs while we hold the lock
+            config.attributes["connection"] = connection
+            command.upgrade(config, "head")
+            connection.commit()
+            return True
+        finally:
+            if use_lock:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+                connection.commit()
+
+
+### Warmup ---------------------------------------------------------------------------------------------
+
+def _warm_pool(engine):
+    #check out as many connections as the pool keeps, so the first requests dont pay for tcp + auth handshakes
+    size = get_settings()["warmup_connections"]
+    if size is None:
+        size = engine.pool.size() if hasattr(engine.pool, "size") else 1
+    connections = []
+    try:
+        for _ in range(size):
+            connection = engine.connect()
+            connection.execute(text("SELECT 1"))
+            connections.append(connection)
+    finally:
+        #closing returns them to the pool, they stay open
+        for connection in connections:
+            connection.close()
+
+
+def _warm_queries():
+    #configure the mappers and run the hot queries once, so sqlalchemy's compiled sql cache is filled
+    #and the response schemas have built their serializers before a real request needs them
+    from sqlalchemy.orm import configure_mappers
+    from .database import SessionLocal
+    from . import crud, models, schemas
+
+    configure_mappers()
+    db = SessionLocal()
+    try:
+        plays = (
+            db.query(models.Play)
+            .filter(models.Play.is_private == False)
+            .order_by(models.Play.created_at.desc())
+            .limit(1)
+            .all()
+        )
+        for play in plays:
+            schemas.PlayOut.model_validate(play).model_dump_json()
+        db.query(models.User).filter(models.User.username == "").first()
+        crud.get_trending_plays(db, limit=1)
+    finally:
+        db.close()
+
+
+def warmup(app):
+    """Prepare everything a first request would otherwise pay for. Raises if any step fails."""
+    from .auth import get_pwd_context
+
+    with timed("warmup"):
+        with timed("warmup.pool"):
+            _warm_pool(get_engine())
+        with timed("warmup.queries"):
+            _warm_queries()
+        with timed("warmup.passlib"):
+            #loads the bcrypt backend, which passlib otherwise does on the first login
+            get_pwd_context().hash("warmup")
+        with timed("warmup.openapi"):
+            #fastapi caches this on the app after the first build
+            app.openapi()
+
+
+async def run_warmup(app):
+    """Run warmup() until it succeeds, then mark the app ready.
+
+    A db blip during boot only delays readiness instead of leaving the worker unready for good.
+    Started from main.py's lifespan and cancelled on shutdown.
+    """
+    delay = WARMUP_RETRY_MIN_SECONDS
+    while True:
+        try:
+            await run_in_threadpool(warmup, app)
+            break
+        except Exception:
+            state["error"] = True
+            logger.exception("Startup warmup failed, retrying in %.0fs", delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, WARMUP_RETRY_MAX_SECONDS)
+
+    state["error"] = False
+    if state["started_at"] is not None:
+        state["timings"]["ready"] = round(time.perf_counter() - state["started_at"], 4)
+    state["ready"] = True
+    logger.info("Startup timings (s): %s", state["timings"])
+
+
+if __name__ == "__main__":
+    import sys
+
+    if sys.argv[1:] != ["migrate"]:
+        sys.exit("usage: python -m app.startup migrate")
+    started = time.perf_counter()
+    migrate()
+    print(f"Migration step took {time.perf_counter() - started:.2f}s")
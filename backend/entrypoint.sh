@@ -4,12 +4,13 @@
 set -e
 
 # Step 1: Run the database migrations.
-# We use 'python -m alembic' to be sure we're using the one we installed.
+# app.startup skips straight away if the db is already at head, otherwise it takes a
+# postgres advisory lock so only one replica runs alembic when many start at once.
 echo "Running database migrations..."
-python -m alembic upgrade head
+python -m app.startup migrate
 
 # Step 2: Start the web server.
 # 'exec "$@"' runs the command that was passed to this script
 # (which is the 'uvicorn' command from our Dockerfile's CMD).
 echo "Starting the web server..."
-exec "$@"
\ No newline at end of file
+exec "$@"
@@ -0,0 +1,25 @@
+#tests run against a real postgres (play stats use postgres-only upserts), set TEST_DATABASE_URL to enable them.
+#it must be a throwaway database, the tables are created and dropped around each test
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+
+
+@pytest.fixture
+def db():
+    url = os.getenv("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(engine)
+        engine.dispose()
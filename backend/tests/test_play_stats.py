@@ -0,0 +1,73 @@
+import math
+
+import pytest
+
+from app import counters, crud, models
+
+
+@pytest.fixture
+def play(db):
+    user = models.User(username="alice", email="alice@x.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    play = models.Play(title="p", owner_id=user.id)
+    db.add(play)
+    db.commit()
+    return play
+
+
+def test_add_play_stats_accumulates(db, play):
+    crud.add_play_stats(db, {play.id: (3, 0)})
+    crud.add_play_stats(db, {play.id: (2, 1)})
+
+    stats = db.get(models.PlayStats, play.id)
+    db.refresh(stats)
+    assert (stats.view_count, stats.copy_count) == (5, 1)
+    #both flushes happen at (almost) the same time, so the score is log2 of the total weight
+    expected = crud._trending_increment(5 * crud.VIEW_WEIGHT + 1 * crud.COPY_WEIGHT)
+    assert stats.trending_score == pytest.approx(expected, abs=1e-3)
+
+
+def test_add_play_stats_after_long_quiet_spell(db, play):
+    #a score from ~3000 half-lives ago, far enough back that 2^(old - new) underflows in postgres
+    old_score = crud._trending_increment(1) - 3000
+    db.add(models.PlayStats(play_id=play.id, view_count=1, trending_score=old_score))
+    db.commit()
+
+    crud.add_play_stats(db, {play.id: (1, 0)})
+
+    stats = db.get(models.PlayStats, play.id)
+    db.refresh(stats)
+    assert stats.view_count == 2
+    #the old activity is worth nothing next to the new view
+    assert stats.trending_score == pytest.approx(crud._trending_increment(1), abs=1e-3)
+    assert math.isfinite(stats.trending_score)
+
+
+def test_add_play_stats_skips_deleted_plays(db, play):
+    assert crud.add_play_stats(db, {play.id: (1, 0), play.id + 1000: (4, 0)}) == 1
+
+
+def test_flush_drops_batch_after_repeated_failures(monkeypatch):
+    def failing(db, deltas):
+        raise RuntimeError("bad row")
+
+    monkeypatch.setattr(crud, "add_play_stats", failing)
+    monkeypatch.setattr(counters, "get_engine", lambda: None)
+    monkeypatch.setattr(counters, "SessionLocal", lambda: type("S", (), {"rollback": lambda s: None, "close": lambda s: None})())
+    monkeypatch.setattr(counters, "_failed_flushes", 0)
+    counters._take_pending()
+    counters.record_view(1)
+
+    for _ in range(counters.MAX_FAILED_FLUSHES - 1):
+        with pytest.raises(RuntimeError):
+            counters.flush()
+        #kept for the next attempt
+        assert counters._take_pending() == {1: (1, 0)}
+        counters.record_view(1)
+
+    with pytest.raises(RuntimeError):
+        counters.flush()
+    #given up on, so the next flush starts from an empty buffer
+    assert counters._take_pending() == {}
+    assert counters._failed_flushes == 0
@@ -148,6 +148,17 @@ export default function PlayDetails() {
   const sliderProgressPercent = frames.length > 1 ? (sliderValue / (frames.length - 1)) * 100 : 0;
 
   const isOwner = user && play && user.id === play.owner_id;
+  // Anyone logged in can copy someone else's play into their own plays (counts towards trending)
+  const canCopy = user && play && user.id !== play.owner?.id;
+
+  async function copyPlay() {
+    try {
+      const { data } = await api.post(`/plays/${id}/copy`);
+      navigate(`/plays/${data.id}/edit`);
+    } catch {
+      alert("Could not copy play");
+    }
+  }
 
   if (!loaded)
     return <div className="text-center text-gray-500 mt-10">Loading…</div>;
@@ -261,8 +272,16 @@ export default function PlayDetails() {
             </select>
           </div>
 
-          {/* Right: Edit Button - Last on mobile, middle on desktop */}
-          <div className="flex items-center w-full sm:w-auto justify-end order-3 sm:order-2">
+          {/* Right: Edit / Copy Buttons - Last on mobile, middle on desktop */}
+          <div className="flex items-center gap-2 w-full sm:w-auto justify-end order-3 sm:order-2">
+              {canCopy && (
+                <button
+                  onClick={copyPlay}
+                  className="px-3 py-1.5 sm:px-4 sm:py-2 rounded-lg border border-blue-600 text-blue-700 hover:bg-blue-50 text-sm sm:text-base text-center"
+                >
+                  Copy
+                </button>
+              )}
               {isOwner && (
                 <Link
                   to={`/plays/${id}/edit`}